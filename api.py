@@ -0,0 +1,274 @@
+import asyncio
+import json
+import math
+import re
+import secrets
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import db
+from auth import hash_password, verify_password
+
+# API HTTP/JSON (ASGI) para entrada de encomendas fora do Streamlit.
+# Executar: uvicorn api:app --host 0.0.0.0 --port 8000
+# Autenticação: header "Authorization: Bearer <token>" (tokens gerados em Admin).
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_PAGE_SIZE = 200
+MAX_SQLITE_INT = 2**63 - 1  # maior INTEGER aceito pelo SQLite
+
+
+class ApiError(Exception):
+	def __init__(self, status: int, message: str) -> None:
+		super().__init__(message)
+		self.status = status
+		self.message = message
+
+
+def issue_token(user_id: int, name: str) -> str:
+	# Formato "<id>.<segredo>"; só o hash do segredo fica no banco
+	secret = secrets.token_urlsafe(32)
+	token_id = db.create_api_token(user_id, name, hash_password(secret))
+	return f"{token_id}.{secret}"
+
+
+def authenticate(header: Optional[str]) -> int:
+	if not header or not header.startswith("Bearer "):
+		raise ApiError(401, "Token ausente.")
+	token_id, _, secret = header[len("Bearer "):].strip().partition(".")
+	row = None
+	if token_id.isascii() and token_id.isdecimal() and int(token_id) <= MAX_SQLITE_INT:
+		row = db.get_api_token(int(token_id))
+	if row is None or not secret or not verify_password(secret, row["token_hash"]):
+		raise ApiError(401, "Token inválido.")
+	return row["user_id"]
+
+
+def _order_json(row) -> Dict[str, Any]:
+	return {k: row[k] for k in row.keys()}
+
+
+def _client_json(row) -> Dict[str, Any]:
+	return {k: row[k] for k in ("id", "name", "phone", "notes", "created_at")}
+
+
+def _text(body: Dict[str, Any], field: str, required: bool = False) -> Optional[str]:
+	value = body.get(field)
+	if value is None or (isinstance(value, str) and not value.strip()):
+		if required:
+			raise ApiError(400, f"Campo '{field}' é obrigatório.")
+		return None
+	if not isinstance(value, str):
+		raise ApiError(400, f"Campo '{field}' deve ser texto.")
+	return value.strip()
+
+
+def _int_param(query: Dict[str, List[str]], name: str, default: Optional[int]) -> Optional[int]:
+	values = query.get(name)
+	if not values:
+		return default
+	try:
+		value = int(values[0])
+	except ValueError:
+		raise ApiError(400, f"Parâmetro '{name}' deve ser inteiro.")
+	if abs(value) > MAX_SQLITE_INT:
+		raise ApiError(400, f"Parâmetro '{name}' fora do intervalo.")
+	return value
+
+
+# HANDLERS (síncronos; executados em thread para não bloquear o loop)
+
+def list_clients(user_id: int, query, body) -> Tuple[int, Any]:
+	return 200, [_client_json(c) for c in db.list_clients(user_id)]
+
+
+def create_client(user_id: int, query, body) -> Tuple[int, Any]:
+	client_id = db.create_client(user_id, _text(body, "name", required=True), _text(body, "phone"), _text(body, "notes"))
+	return 201, _client_json(db.get_client(user_id, client_id))
+
+
+def update_client(user_id: int, query, body, client_id: int) -> Tuple[int, Any]:
+	current = db.get_client(user_id, client_id)
+	if current is None:
+		raise ApiError(404, "Cliente não encontrado.")
+	name = _text(body, "name") or current["name"]
+	phone = _text(body, "phone") if "phone" in body else current["phone"]
+	notes = _text(body, "notes") if "notes" in body else current["notes"]
+	db.update_client(user_id, client_id, name, phone, notes)
+	return 200, _client_json(db.get_client(user_id, client_id))
+
+
+def list_orders(user_id: int, query, body) -> Tuple[int, Any]:
+	limit = _int_param(query, "limit", 50)
+	if not 1 <= limit <= MAX_PAGE_SIZE:
+		raise ApiError(400, f"'limit' deve estar entre 1 e {MAX_PAGE_SIZE}.")
+	status = query.get("status", [None])[0]
+	if status is not None and status not in db.STATUS_OPTIONS:
+		raise ApiError(400, "Status inválido.")
+	rows = db.list_orders_page(
+		user_id,
+		after_id=_int_param(query, "after", 0),
+		limit=limit,
+		status=status,
+		client_id=_int_param(query, "client_id", None),
+	)
+	next_after = rows[-1]["id"] if len(rows) == limit else None
+	return 200, {"items": [_order_json(o) for o in rows], "next_after": next_after}
+
+
+def create_order(user_id: int, query, body) -> Tuple[int, Any]:
+	client_id = body.get("client_id")
+	if (
+		isinstance(client_id, bool)
+		or not isinstance(client_id, int)
+		or abs(client_id) > MAX_SQLITE_INT
+		or db.get_client(user_id, client_id) is None
+	):
+		raise ApiError(400, "Cliente inválido.")
+	due = _text(body, "due_date", required=True)
+	try:
+		due_date_iso = date.fromisoformat(due).isoformat()
+	except ValueError:
+		raise ApiError(400, "'due_date' deve estar no formato AAAA-MM-DD.")
+	status = _text(body, "status") or db.STATUS_OPTIONS[0]
+	if status not in db.STATUS_OPTIONS:
+		raise ApiError(400, "Status inválido.")
+	price = body.get("price")
+	if price is not None and (isinstance(price, bool) or not isinstance(price, (int, float)) or not math.isfinite(price)):
+		raise ApiError(400, "'price' deve ser numérico.")
+	if price is not None and price < 0:
+		raise ApiError(400, "'price' não pode ser negativo.")
+	order_id = db.create_order(
+		user_id,
+		client_id,
+		_text(body, "flavor", required=True),
+		_text(body, "size"),
+		float(price) if price is not None else None,
+		due_date_iso,
+		status,
+		_text(body, "notes"),
+	)
+	return 201, _order_json(db.get_order(user_id, order_id))
+
+
+def get_order(user_id: int, query, body, order_id: int) -> Tuple[int, Any]:
+	row = db.get_order(user_id, order_id)
+	if row is None:
+		raise ApiError(404, "Encomenda não encontrada.")
+	return 200, _order_json(row)
+
+
+def update_order(user_id: int, query, body, order_id: int) -> Tuple[int, Any]:
+	if set(body) - {"status"}:
+		raise ApiError(400, "Somente 'status' pode ser alterado.")
+	status = _text(body, "status", required=True)
+	if status not in db.STATUS_OPTIONS:
+		raise ApiError(400, "Status inválido.")
+	if db.get_order(user_id, order_id) is None:
+		raise ApiError(404, "Encomenda não encontrada.")
+	db.update_order_status(user_id, order_id, status)
+	return 200, _order_json(db.get_order(user_id, order_id))
+
+
+ROUTES = [
+	("GET", re.compile(r"^/clients$"), list_clients),
+	("POST", re.compile(r"^/clients$"), create_client),
+	("PATCH", re.compile(r"^/clients/(\d+)$"), update_client),
+	("GET", re.compile(r"^/orders$"), list_orders),
+	("POST", re.compile(r"^/orders$"), create_order),
+	("GET", re.compile(r"^/orders/(\d+)$"), get_order),
+	("PATCH", re.compile(r"^/orders/(\d+)$"), update_order),
+]
+
+
+def _match(method: str, path: str):
+	path_found = False
+	for route_method, pattern, handler in ROUTES:
+		m = pattern.match(path)
+		if m:
+			path_found = True
+			if route_method == method:
+				ids = [int(g) for g in m.groups()]
+				# Ids fora do INTEGER do SQLite não existem no banco
+				if any(i > MAX_SQLITE_INT for i in ids):
+					raise ApiError(404, "Registro não encontrado.")
+				return handler, ids
+	raise ApiError(405 if path_found else 404, "Método não permitido." if path_found else "Rota não encontrada.")
+
+
+async def _read_body(receive) -> bytes:
+	chunks = []
+	size = 0
+	while True:
+		message = await receive()
+		chunk = message.get("body", b"")
+		size += len(chunk)
+		if size > MAX_BODY_BYTES:
+			raise ApiError(413, "Corpo da requisição muito grande.")
+		chunks.append(chunk)
+		if not message.get("more_body"):
+			return b"".join(chunks)
+
+
+async def _send_json(send, status: int, payload: Any) -> None:
+	body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+	await send(
+		{
+			"type": "http.response.start",
+			"status": status,
+			"headers": [
+				(b"content-type", b"application/json; charset=utf-8"),
+				(b"content-length", str(len(body)).encode()),
+			],
+		}
+	)
+	await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send) -> None:
+	while True:
+		message = await receive()
+		if message["type"] == "lifespan.startup":
+			db.init_db()
+			await send({"type": "lifespan.startup.complete"})
+		elif message["type"] == "lifespan.shutdown":
+			await send({"type": "lifespan.shutdown.complete"})
+			return
+
+
+async def app(scope, receive, send) -> None:
+	if scope["type"] == "lifespan":
+		await _lifespan(receive, send)
+		return
+	if scope["type"] != "http":
+		return
+
+	try:
+		if scope["path"] == "/health":
+			await _send_json(send, 200, {"status": "ok"})
+			return
+		handler, args = _match(scope["method"], scope["path"])
+		headers = dict(scope["headers"])
+		auth_header = headers.get(b"authorization", b"").decode("latin-1")
+		query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+		raw = await _read_body(receive)
+		try:
+			body = json.loads(raw) if raw else {}
+		except ValueError:
+			raise ApiError(400, "JSON inválido.")
+		if not isinstance(body, dict):
+			raise ApiError(400, "O corpo deve ser um objeto JSON.")
+
+		def _call():
+			user_id = authenticate(auth_header)
+			return handler(user_id, query, body, *args)
+
+		status, payload = await asyncio.to_thread(_call)
+	except ApiError as e:
+		await _send_json(send, e.status, {"error": e.message})
+		return
+	except Exception:
+		await _send_json(send, 500, {"error": "Erro interno."})
+		raise
+	await _send_json(send, status, payload)
@@ -3,8 +3,13 @@ from datetime import date
 import pandas as pd
 
 import db
+import maintenance
+import order_store
 from auth import verify_password
 
+STATUS_PENDENTE, STATUS_PREPARANDO, STATUS_ENTREGUE = db.STATUS_OPTIONS
+REFRESH_SECONDS = 10
+
 
 def set_page_config():
 	st.set_page_config(
@@ -81,48 +86,118 @@ def render_header():
 		st.metric("Usuário", a["username"])  # simples indicativo
 
 
-def dashboard():
+def load_dashboard_state():
+	# Carregado uma vez por execução completa; os fragmentos reutilizam este estado
 	a = st.session_state.auth
-	counts = db.stats_counts(a["user_id"]) if a["user_id"] else {"Pendente": 0, "Pago (Em preparação)": 0, "Entregue": 0}
-	st.markdown("## Visão Geral")
+	seq = 0
+	if a["user_id"]:
+		seq, counts = db.stats_snapshot(a["user_id"])
+		rows = order_store.list_orders_by_status(a["user_id"], [STATUS_PENDENTE, STATUS_PREPARANDO])
+	else:
+		counts = {STATUS_PENDENTE: 0, STATUS_PREPARANDO: 0, STATUS_ENTREGUE: 0}
+		rows = []
+	st.session_state.dashboard = {
+		"seq": seq,
+		"counts": counts,
+		STATUS_PENDENTE: [dict(o) for o in rows if o["status"] == STATUS_PENDENTE],
+		STATUS_PREPARANDO: [dict(o) for o in rows if o["status"] == STATUS_PREPARANDO],
+	}
+
+
+def apply_dashboard_changes():
+	# Aplica só as alterações registradas desde o último seq (order_events)
+	a = st.session_state.auth
+	state = st.session_state.dashboard
+	if not a["user_id"]:
+		return
+	changes = db.changes_since(a["user_id"], state["seq"])
+	if not changes:
+		return
+
+	# Contadores atualizados pelos deltas de cada evento (old_status -> new_status)
+	counts = state["counts"]
+	latest = {}
+	for ch in changes:
+		latest[ch["order_id"]] = ch
+		if ch["old_status"] in counts:
+			counts[ch["old_status"]] -= 1
+		if ch["new_status"] in counts:
+			counts[ch["new_status"]] += 1
+
+	for status in (STATUS_PENDENTE, STATUS_PREPARANDO):
+		rows = [o for o in state[status] if o["id"] not in latest]
+		added = False
+		for ch in latest.values():
+			if ch["id"] is not None and ch["status"] == status:
+				row = dict(ch)
+				for k in ("seq", "order_id", "kind", "old_status", "new_status"):
+					row.pop(k)
+				rows.append(row)
+				added = True
+		if added:
+			# Mesma ordenação de list_orders: due_date ASC, created_at DESC
+			rows.sort(key=lambda o: o["created_at"], reverse=True)
+			rows.sort(key=lambda o: o["due_date"])
+		state[status] = rows
+
+	state["seq"] = changes[-1]["seq"]
+
+
+def advance_order(order_id: int, to_status: str):
+	# Callback dos botões: o fragmento aplica a alteração via changes_since
+	a = st.session_state.auth
+	db.update_order_status(a["user_id"], order_id, to_status)
+	st.toast(f"Atualizado para {to_status}.")
+
+
+def render_order_row(o, button_label: str, key_prefix: str, to_status: str):
+	row = st.columns([0.28, 0.18, 0.18, 0.18, 0.18])
+	with row[0]:
+		st.write(f"{o['client_name']} — {o['flavor']}")
+	with row[1]:
+		st.caption(f"Tamanho: {o['size'] or '-'}")
+	with row[2]:
+		st.caption(f"Entrega: {o['due_date']}")
+	with row[3]:
+		st.caption(f"Preço: R$ {o['price'] if o['price'] is not None else '-'}")
+	with row[4]:
+		st.button(
+			button_label,
+			key=f"{key_prefix}_{o['id']}",
+			on_click=advance_order,
+			args=(o["id"], to_status),
+		)
+	st.divider()
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def order_board():
+	# Cliques e atualização automática reexecutam apenas este fragmento (sem init_db, CSS, cabeçalho)
+	apply_dashboard_changes()
+	state = st.session_state.dashboard
+	counts = state["counts"]
 
 	c1, c2, c3 = st.columns(3)
 	with c1:
-		st.metric("Pendente", counts.get("Pendente", 0))
+		st.metric("Pendente", counts.get(STATUS_PENDENTE, 0))
 	with c2:
-		st.metric("Pago (Em preparação)", counts.get("Pago (Em preparação)", 0))
+		st.metric("Pago (Em preparação)", counts.get(STATUS_PREPARANDO, 0))
 	with c3:
-		st.metric("Entregue", counts.get("Entregue", 0))
+		st.metric("Entregue", counts.get(STATUS_ENTREGUE, 0))
 
 	st.markdown("---")
 
 	# Destaques com ações rápidas
 	st.markdown("### Destaques de Hoje e Próximos Dias")
-	orders = db.list_orders(a["user_id"]) if a["user_id"] else []
-
-	pendentes = [o for o in orders if o["status"] == "Pendente"]
-	preparando = [o for o in orders if o["status"].startswith("Pago")]
+	pendentes = state[STATUS_PENDENTE]
+	preparando = state[STATUS_PREPARANDO]
 
 	col1, col2 = st.columns(2)
 	with col1:
 		st.markdown("#### Pendentes")
 		if pendentes:
 			for o in pendentes:
-				row = st.columns([0.28, 0.18, 0.18, 0.18, 0.18])
-				with row[0]:
-					st.write(f"{o['client_name']} — {o['flavor']}")
-				with row[1]:
-					st.caption(f"Tamanho: {o['size'] or '-'}")
-				with row[2]:
-					st.caption(f"Entrega: {o['due_date']}")
-				with row[3]:
-					st.caption(f"Preço: R$ {o['price'] if o['price'] is not None else '-'}")
-				with row[4]:
-					if st.button("Marcar: Em preparação", key=f"mark_prep_{o['id']}"):
-						db.update_order_status(a["user_id"], o["id"], "Pago (Em preparação)")
-						st.success("Atualizado para Em preparação.")
-						st.rerun()
-				st.divider()
+				render_order_row(o, "Marcar: Em preparação", "mark_prep", STATUS_PREPARANDO)
 		else:
 			st.info("Sem pedidos pendentes.")
 
@@ -130,25 +205,17 @@ def dashboard():
 		st.markdown("#### Em preparação (Pago)")
 		if preparando:
 			for o in preparando:
-				row = st.columns([0.28, 0.18, 0.18, 0.18, 0.18])
-				with row[0]:
-					st.write(f"{o['client_name']} — {o['flavor']}")
-				with row[1]:
-					st.caption(f"Tamanho: {o['size'] or '-'}")
-				with row[2]:
-					st.caption(f"Entrega: {o['due_date']}")
-				with row[3]:
-					st.caption(f"Preço: R$ {o['price'] if o['price'] is not None else '-'}")
-				with row[4]:
-					if st.button("Marcar: Entregue", key=f"mark_done_{o['id']}"):
-						db.update_order_status(a["user_id"], o["id"], "Entregue")
-						st.success("Atualizado para Entregue.")
-						st.rerun()
-				st.divider()
+				render_order_row(o, "Marcar: Entregue", "mark_done", STATUS_ENTREGUE)
 		else:
 			st.info("Sem pedidos em preparação.")
 
 
+def dashboard():
+	load_dashboard_state()
+	st.markdown("## Visão Geral")
+	order_board()
+
+
 def sidebar_nav():
 	a = st.session_state.auth
 	st.sidebar.markdown("## Navegação")
@@ -166,6 +233,7 @@ def main():
 	ensure_session_state()
 
 	db.init_db()
+	maintenance.run_due_tasks_async()
 
 	a = st.session_state.auth
 
@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+import db
+
+# Teste de carga da API (api.py): requisições/s e latência p50/p99.
+# Sem --url, sobe "uvicorn api:app" sobre um banco temporário em data/app.db.
+# Uso: python bench_api.py [--scenario create|list|mixed] [--requests N] [--concurrency C]
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _free_port() -> int:
+	with socket.socket() as s:
+		s.bind(("127.0.0.1", 0))
+		return s.getsockname()[1]
+
+
+def prepare_database(workdir: str) -> Tuple[str, int]:
+	import api
+
+	db.DB_DIR = os.path.join(workdir, "data")
+	db.DB_PATH = os.path.join(db.DB_DIR, "app.db")
+	db.init_db()
+	user_id = db.create_user("bench", "x", "Bench", None, False)
+	client_id = db.create_client(user_id, "Cliente Bench", None, None)
+	return api.issue_token(user_id, "bench"), client_id
+
+
+def start_server(workdir: str, port: int) -> subprocess.Popen:
+	env = dict(os.environ, PYTHONPATH=ROOT)
+	proc = subprocess.Popen(
+		[sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+		cwd=workdir,
+		env=env,
+	)
+	deadline = time.time() + 15
+	while time.time() < deadline:
+		try:
+			with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+				return proc
+		except OSError:
+			time.sleep(0.1)
+	proc.kill()
+	raise RuntimeError("uvicorn não iniciou")
+
+
+async def _request(reader, writer, host: str, method: str, path: str, token: str, body: Optional[dict]) -> Tuple[int, bytes]:
+	payload = json.dumps(body).encode("utf-8") if body is not None else b""
+	head = (
+		f"{method} {path} HTTP/1.1\r\n"
+		f"Host: {host}\r\n"
+		f"Authorization: Bearer {token}\r\n"
+		f"Content-Type: application/json\r\n"
+		f"Content-Length: {len(payload)}\r\n\r\n"
+	)
+	writer.write(head.encode("latin-1") + payload)
+	await writer.drain()
+	raw_headers = await reader.readuntil(b"\r\n\r\n")
+	lines = raw_headers.decode("latin-1").split("\r\n")
+	status = int(lines[0].split()[1])
+	length = 0
+	for line in lines[1:]:
+		if line.lower().startswith("content-length:"):
+			length = int(line.split(":", 1)[1])
+	return status, await reader.readexactly(length)
+
+
+def _next_call(scenario: str, client_id: int, created: List[int]):
+	kind = scenario
+	if scenario == "mixed":
+		kind = random.choices(["create", "list", "update"], weights=[4, 5, 1])[0]
+		if kind == "update" and not created:
+			kind = "create"
+	if kind == "create":
+		due = (date.today() + timedelta(days=random.randint(0, 30))).isoformat()
+		body = {"client_id": client_id, "flavor": "Chocolate", "size": "1kg", "price": 120.0, "due_date": due}
+		return "POST", "/orders", body
+	if kind == "list":
+		return "GET", "/orders?limit=50", None
+	return "PATCH", f"/orders/{random.choice(created)}", {"status": db.STATUS_OPTIONS[1]}
+
+
+async def run_load(url: str, token: str, client_id: int, scenario: str, total: int, concurrency: int):
+	parsed = urlparse(url)
+	host = parsed.hostname or "127.0.0.1"
+	port = parsed.port or 80
+	latencies: List[float] = []
+	errors = 0
+	remaining = total
+	created: List[int] = []
+
+	async def worker():
+		nonlocal remaining, errors
+		reader, writer = await asyncio.open_connection(host, port)
+		try:
+			while remaining > 0:
+				remaining -= 1
+				method, path, body = _next_call(scenario, client_id, created)
+				start = time.perf_counter()
+				status, _ = await _request(reader, writer, f"{host}:{port}", method, path, token, body)
+				latencies.append(time.perf_counter() - start)
+				if status >= 400:
+					errors += 1
+		finally:
+			writer.close()
+
+	# Garante páginas cheias e encomendas para atualizar
+	reader, writer = await asyncio.open_connection(host, port)
+	for _ in range(50):
+		method, path, body = _next_call("create", client_id, created)
+		status, payload = await _request(reader, writer, f"{host}:{port}", method, path, token, body)
+		if status != 201:
+			raise RuntimeError(f"falha ao criar encomendas iniciais: {status} {payload!r}")
+		created.append(json.loads(payload)["id"])
+	writer.close()
+
+	start = time.perf_counter()
+	await asyncio.gather(*(worker() for _ in range(concurrency)))
+	elapsed = time.perf_counter() - start
+	return latencies, errors, elapsed
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Teste de carga da API de encomendas")
+	parser.add_argument("--url", help="API já em execução (exige --token e --client-id)")
+	parser.add_argument("--token")
+	parser.add_argument("--client-id", type=int)
+	parser.add_argument("--scenario", choices=["create", "list", "mixed"], default="mixed")
+	parser.add_argument("--requests", type=int, default=2000)
+	parser.add_argument("--concurrency", type=int, default=16)
+	args = parser.parse_args()
+
+	proc = None
+	if args.url:
+		url, token, client_id = args.url, args.token, args.client_id
+	else:
+		workdir = tempfile.mkdtemp()
+		token, client_id = prepare_database(workdir)
+		port = _free_port()
+		proc = start_server(workdir, port)
+		url = f"http://127.0.0.1:{port}"
+
+	try:
+		latencies, errors, elapsed = asyncio.run(
+			run_load(url, token, client_id, args.scenario, args.requests, args.concurrency)
+		)
+	finally:
+		if proc is not None:
+			proc.terminate()
+			proc.wait()
+
+	latencies.sort()
+	p50 = latencies[len(latencies) // 2] * 1000
+	p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+	print(f"cenário={args.scenario} requisições={len(latencies)} concorrência={args.concurrency} erros={errors}")
+	print(f"req/s={len(latencies) / elapsed:.1f} p50={p50:.2f} ms p99={p99:.2f} ms")
+
+
+if __name__ == "__main__":
+	main()
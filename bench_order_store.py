@@ -0,0 +1,130 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import db
+import order_store
+
+# Compara listas de sqlite3.Row (db.list_orders) com o OrderStore em memória.
+# Uso: python bench_order_store.py [n_pedidos]
+
+FLAVORS = ["Chocolate", "Morango", "Limão", "Red Velvet", "Prestígio", "Ninho", "Cenoura", "Abacaxi"]
+SIZES = ["1kg", "2kg", "20cm", "25cm", None]
+N_CLIENTS = 500
+REPEAT = 20
+
+
+def populate(n_orders: int) -> int:
+	db.init_db()
+	user_id = db.create_user("bench", "x", "Bench", None, False)
+	conn = db.get_connection()
+	now = datetime.utcnow()
+	conn.executemany(
+		"INSERT INTO clients (user_id, name, phone, notes, created_at) VALUES (?, ?, ?, ?, ?)",
+		[(user_id, f"Cliente {i}", None, None, now.isoformat()) for i in range(N_CLIENTS)],
+	)
+	client_ids = [r["id"] for r in conn.execute("SELECT id FROM clients WHERE user_id = ?", (user_id,))]
+	today = date.today()
+	rows = []
+	for i in range(n_orders):
+		rows.append(
+			(
+				user_id,
+				random.choice(client_ids),
+				random.choice(FLAVORS),
+				random.choice(SIZES),
+				round(random.uniform(50, 300), 2),
+				(today + timedelta(days=random.randint(-180, 180))).isoformat(),
+				random.choice(db.STATUS_OPTIONS),
+				None,
+				(now - timedelta(seconds=i)).isoformat(),
+			)
+		)
+	conn.executemany(
+		"""
+		INSERT INTO orders (user_id, client_id, flavor, size, price, due_date, status, notes, created_at)
+		VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+		""",
+		rows,
+	)
+	conn.commit()
+	conn.close()
+	return user_id
+
+
+def measure_memory(fn):
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	result = fn()
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+	size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+	return result, size
+
+
+def timed(fn) -> float:
+	start = time.perf_counter()
+	for _ in range(REPEAT):
+		fn()
+	return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+	n_orders = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+	random.seed(42)
+	tmp = tempfile.mkdtemp()
+	db.DB_DIR = tmp
+	db.DB_PATH = os.path.join(tmp, "app.db")
+
+	user_id = populate(n_orders)
+	rows, rows_bytes = measure_memory(lambda: db.list_orders(user_id))
+	store, store_bytes = measure_memory(lambda: order_store.get_store(user_id))
+
+	client_id = rows[0]["client_id"]
+	start_iso = date.today().isoformat()
+	end_iso = (date.today() + timedelta(days=7)).isoformat()
+
+	print(f"{n_orders} encomendas, {N_CLIENTS} clientes (Python {sys.version.split()[0]}, SQLite {sqlite3.sqlite_version})")
+	print(f"{'memória':<28}{'Row list':>14}{'OrderStore':>14}")
+	print(f"{'MiB':<28}{rows_bytes / 2**20:>14.1f}{store_bytes / 2**20:>14.1f}")
+	print()
+	print(f"{'consulta (ms/op)':<28}{'Row list':>14}{'OrderStore':>14}")
+	cases = [
+		(
+			"status == Pendente",
+			lambda: [o for o in rows if o["status"] == "Pendente"],
+			lambda: store.by_status(["Pendente"]),
+		),
+		(
+			"status startswith Pago",
+			lambda: [o for o in rows if o["status"].startswith("Pago")],
+			lambda: store.by_status([db.STATUS_OPTIONS[1]]),
+		),
+		(
+			"client_id == X",
+			lambda: [o for o in rows if o["client_id"] == client_id],
+			lambda: store.by_client(client_id),
+		),
+		(
+			"due_date nos próximos 7 dias",
+			lambda: [o for o in rows if start_iso <= o["due_date"] <= end_iso],
+			lambda: store.due_between(start_iso, end_iso),
+		),
+		(
+			"contagem por status",
+			lambda: {s: sum(1 for o in rows if o["status"] == s) for s in db.STATUS_OPTIONS},
+			lambda: store.counts(),
+		),
+	]
+	for label, baseline, indexed in cases:
+		assert len(baseline()) == len(indexed())
+		print(f"{label:<28}{timed(baseline):>14.2f}{timed(indexed):>14.2f}")
+
+
+if __name__ == "__main__":
+	main()
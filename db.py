@@ -1,11 +1,13 @@
 import os
 import sqlite3
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 
 DB_DIR = os.path.join("data")
 DB_PATH = os.path.join(DB_DIR, "app.db")
 
+STATUS_OPTIONS = ["Pendente", "Pago (Em preparação)", "Entregue"]
+
 
 def get_connection() -> sqlite3.Connection:
 	os.makedirs(DB_DIR, exist_ok=True)
@@ -70,6 +72,53 @@ def init_db() -> None:
 		"""
 	)
 
+	# Índice para as consultas por status do painel (Home)
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_user_status ON orders (user_id, status)")
+
+	# Log de alterações das encomendas (somente inclusão), lido por changes_since
+	cur.execute(
+		"""
+		CREATE TABLE IF NOT EXISTS order_events (
+			seq INTEGER PRIMARY KEY AUTOINCREMENT,
+			user_id INTEGER NOT NULL,
+			order_id INTEGER NOT NULL,
+			kind TEXT NOT NULL,
+			old_status TEXT,
+			new_status TEXT,
+			created_at TEXT NOT NULL
+		)
+		"""
+	)
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_order_events_user_seq ON order_events (user_id, seq)")
+
+	# Tokens da API HTTP (token_hash via auth.hash_password)
+	cur.execute(
+		"""
+		CREATE TABLE IF NOT EXISTS api_tokens (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			user_id INTEGER NOT NULL,
+			name TEXT NOT NULL,
+			token_hash TEXT NOT NULL,
+			created_at TEXT NOT NULL,
+			FOREIGN KEY (user_id) REFERENCES users (id)
+		)
+		"""
+	)
+
+	# Histórico das rotinas de manutenção (backup, verificação, vacuum)
+	cur.execute(
+		"""
+		CREATE TABLE IF NOT EXISTS maintenance_runs (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			task TEXT NOT NULL,
+			started_at TEXT NOT NULL,
+			duration_ms REAL NOT NULL,
+			ok INTEGER NOT NULL,
+			details TEXT
+		)
+		"""
+	)
+
 	conn.commit()
 
 	# Seed de superusuário padrão se nenhum usuário existir
@@ -155,6 +204,113 @@ def update_user_password(user_id: int, new_password_hash: str) -> None:
 	conn.close()
 
 
+# API TOKENS
+
+def create_api_token(user_id: int, name: str, token_hash: str) -> int:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute(
+		"""
+		INSERT INTO api_tokens (user_id, name, token_hash, created_at)
+		VALUES (?, ?, ?, ?)
+		""",
+		(user_id, name, token_hash, datetime.utcnow().isoformat()),
+	)
+	conn.commit()
+	token_id = cur.lastrowid
+	cur.close()
+	conn.close()
+	return token_id
+
+
+def get_api_token(token_id: int) -> Optional[sqlite3.Row]:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute("SELECT * FROM api_tokens WHERE id = ?", (token_id,))
+	row = cur.fetchone()
+	cur.close()
+	conn.close()
+	return row
+
+
+def list_api_tokens() -> List[sqlite3.Row]:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute(
+		"""
+		SELECT t.id, t.user_id, t.name, t.created_at, u.username
+		FROM api_tokens t
+		JOIN users u ON u.id = t.user_id
+		ORDER BY t.created_at DESC
+		"""
+	)
+	rows = cur.fetchall()
+	cur.close()
+	conn.close()
+	return rows
+
+
+def delete_api_token(token_id: int) -> None:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute("DELETE FROM api_tokens WHERE id = ?", (token_id,))
+	conn.commit()
+	cur.close()
+	conn.close()
+
+
+# ORDER EVENTS
+
+def _log_order_event(
+	cur: sqlite3.Cursor,
+	user_id: int,
+	order_id: int,
+	kind: str,
+	old_status: Optional[str],
+	new_status: Optional[str],
+) -> None:
+	# Chamado na mesma transação da escrita em orders; old/new_status permitem
+	# atualizar contadores pelos deltas, sem recontar
+	cur.execute(
+		"""
+		INSERT INTO order_events (user_id, order_id, kind, old_status, new_status, created_at)
+		VALUES (?, ?, ?, ?, ?, ?)
+		""",
+		(user_id, order_id, kind, old_status, new_status, datetime.utcnow().isoformat()),
+	)
+
+
+def latest_change_seq(user_id: int) -> int:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute("SELECT COALESCE(MAX(seq), 0) AS seq FROM order_events WHERE user_id = ?", (user_id,))
+	seq = cur.fetchone()["seq"]
+	cur.close()
+	conn.close()
+	return seq
+
+
+def changes_since(user_id: int, seq: int) -> List[sqlite3.Row]:
+	# Eventos com seq > seq, já com o estado atual da encomenda (colunas nulas se removida)
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute(
+		"""
+		SELECT e.seq, e.order_id, e.kind, e.old_status, e.new_status, o.*, c.name AS client_name
+		FROM order_events e
+		LEFT JOIN orders o ON o.id = e.order_id
+		LEFT JOIN clients c ON c.id = o.client_id
+		WHERE e.user_id = ? AND e.seq > ?
+		ORDER BY e.seq ASC
+		""",
+		(user_id, seq),
+	)
+	rows = cur.fetchall()
+	cur.close()
+	conn.close()
+	return rows
+
+
 # CLIENTS
 
 def create_client(user_id: int, name: str, phone: Optional[str], notes: Optional[str]) -> int:
@@ -184,10 +340,47 @@ def list_clients(user_id: int) -> List[sqlite3.Row]:
 	return rows
 
 
+def get_client(user_id: int, client_id: int) -> Optional[sqlite3.Row]:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute("SELECT * FROM clients WHERE user_id = ? AND id = ?", (user_id, client_id))
+	row = cur.fetchone()
+	cur.close()
+	conn.close()
+	return row
+
+
+def update_client(user_id: int, client_id: int, name: str, phone: Optional[str], notes: Optional[str]) -> None:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute(
+		"UPDATE clients SET name = ?, phone = ?, notes = ? WHERE user_id = ? AND id = ?",
+		(name, phone, notes, user_id, client_id),
+	)
+	# O nome do cliente aparece nas encomendas: registra a alteração de cada uma
+	cur.execute(
+		"""
+		INSERT INTO order_events (user_id, order_id, kind, old_status, new_status, created_at)
+		SELECT user_id, id, 'updated', status, status, ? FROM orders WHERE user_id = ? AND client_id = ?
+		""",
+		(datetime.utcnow().isoformat(), user_id, client_id),
+	)
+	conn.commit()
+	cur.close()
+	conn.close()
+
+
 def delete_client(user_id: int, client_id: int) -> None:
 	conn = get_connection()
 	cur = conn.cursor()
 	# Também apagamos encomendas do cliente
+	cur.execute(
+		"""
+		INSERT INTO order_events (user_id, order_id, kind, old_status, new_status, created_at)
+		SELECT user_id, id, 'deleted', status, NULL, ? FROM orders WHERE user_id = ? AND client_id = ?
+		""",
+		(datetime.utcnow().isoformat(), user_id, client_id),
+	)
 	cur.execute("DELETE FROM orders WHERE user_id = ? AND client_id = ?", (user_id, client_id))
 	cur.execute("DELETE FROM clients WHERE user_id = ? AND id = ?", (user_id, client_id))
 	conn.commit()
@@ -226,13 +419,32 @@ def create_order(
 			datetime.utcnow().isoformat(),
 		),
 	)
-	conn.commit()
 	order_id = cur.lastrowid
+	_log_order_event(cur, user_id, order_id, "created", None, status)
+	conn.commit()
 	cur.close()
 	conn.close()
 	return order_id
 
 
+def get_order(user_id: int, order_id: int) -> Optional[sqlite3.Row]:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute(
+		"""
+		SELECT o.*, c.name AS client_name
+		FROM orders o
+		JOIN clients c ON c.id = o.client_id
+		WHERE o.user_id = ? AND o.id = ?
+		""",
+		(user_id, order_id),
+	)
+	row = cur.fetchone()
+	cur.close()
+	conn.close()
+	return row
+
+
 def list_orders(user_id: int) -> List[sqlite3.Row]:
 	conn = get_connection()
 	cur = conn.cursor()
@@ -271,9 +483,73 @@ def list_orders_by_client(user_id: int, client_id: int) -> List[sqlite3.Row]:
 	return rows
 
 
+def list_orders_page(
+	user_id: int,
+	after_id: int = 0,
+	limit: int = 50,
+	status: Optional[str] = None,
+	client_id: Optional[int] = None,
+) -> List[sqlite3.Row]:
+	# Paginação por chave (o.id > after_id), sem OFFSET
+	conn = get_connection()
+	cur = conn.cursor()
+	where = "o.user_id = ? AND o.id > ?"
+	params: list = [user_id, after_id]
+	if status is not None:
+		where += " AND o.status = ?"
+		params.append(status)
+	if client_id is not None:
+		where += " AND o.client_id = ?"
+		params.append(client_id)
+	cur.execute(
+		f"""
+		SELECT o.*, c.name AS client_name
+		FROM orders o
+		JOIN clients c ON c.id = o.client_id
+		WHERE {where}
+		ORDER BY o.id ASC
+		LIMIT ?
+		""",
+		(*params, limit),
+	)
+	rows = cur.fetchall()
+	cur.close()
+	conn.close()
+	return rows
+
+
+def list_orders_by_status(user_id: int, statuses: List[str]) -> List[sqlite3.Row]:
+	conn = get_connection()
+	cur = conn.cursor()
+	placeholders = ", ".join("?" for _ in statuses)
+	cur.execute(
+		f"""
+		SELECT o.*, c.name AS client_name
+		FROM orders o
+		JOIN clients c ON c.id = o.client_id
+		WHERE o.user_id = ? AND o.status IN ({placeholders})
+		ORDER BY o.due_date ASC, o.created_at DESC
+		""",
+		(user_id, *statuses),
+	)
+	rows = cur.fetchall()
+	cur.close()
+	conn.close()
+	return rows
+
+
 def update_order_status(user_id: int, order_id: int, status: str) -> None:
 	conn = get_connection()
 	cur = conn.cursor()
+	# Transação de escrita antes do SELECT: o status anterior não muda até o commit
+	cur.execute("BEGIN IMMEDIATE")
+	cur.execute("SELECT status FROM orders WHERE user_id = ? AND id = ?", (user_id, order_id))
+	current = cur.fetchone()
+	if current is None:
+		conn.rollback()
+		cur.close()
+		conn.close()
+		return
 	timestamp_field = None
 	if status.startswith("Pago"):
 		timestamp_field = "paid_at"
@@ -290,6 +566,7 @@ def update_order_status(user_id: int, order_id: int, status: str) -> None:
 			"UPDATE orders SET status = ? WHERE user_id = ? AND id = ?",
 			(status, user_id, order_id),
 		)
+	_log_order_event(cur, user_id, order_id, "updated", current["status"], status)
 	conn.commit()
 	cur.close()
 	conn.close()
@@ -298,20 +575,84 @@ def update_order_status(user_id: int, order_id: int, status: str) -> None:
 def delete_order(user_id: int, order_id: int) -> None:
 	conn = get_connection()
 	cur = conn.cursor()
+	cur.execute("BEGIN IMMEDIATE")
+	cur.execute("SELECT status FROM orders WHERE user_id = ? AND id = ?", (user_id, order_id))
+	current = cur.fetchone()
 	cur.execute("DELETE FROM orders WHERE user_id = ? AND id = ?", (user_id, order_id))
+	if current is not None:
+		_log_order_event(cur, user_id, order_id, "deleted", current["status"], None)
 	conn.commit()
 	cur.close()
 	conn.close()
 
 
+def _count_by_status(cur: sqlite3.Cursor, user_id: int) -> Dict[str, int]:
+	result: Dict[str, int] = {s: 0 for s in STATUS_OPTIONS}
+	# Uma única consulta agrupada (usa idx_orders_user_status)
+	cur.execute("SELECT status, COUNT(1) AS c FROM orders WHERE user_id = ? GROUP BY status", (user_id,))
+	for row in cur.fetchall():
+		if row["status"] in result:
+			result[row["status"]] = row["c"]
+	return result
+
+
 def stats_counts(user_id: int) -> Dict[str, int]:
 	conn = get_connection()
 	cur = conn.cursor()
-	statuses = ["Pendente", "Pago (Em preparação)", "Entregue"]
-	result: Dict[str, int] = {s: 0 for s in statuses}
-	for s in statuses:
-		cur.execute("SELECT COUNT(1) AS c FROM orders WHERE user_id = ? AND status = ?", (user_id, s))
-		result[s] = cur.fetchone()["c"]
+	result = _count_by_status(cur, user_id)
 	cur.close()
 	conn.close()
 	return result
+
+
+def stats_snapshot(user_id: int) -> Tuple[int, Dict[str, int]]:
+	# seq e contagens na mesma transação de leitura: os deltas de changes_since(seq)
+	# podem ser somados às contagens sem contar nada duas vezes
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute("BEGIN")
+	cur.execute("SELECT COALESCE(MAX(seq), 0) AS seq FROM order_events WHERE user_id = ?", (user_id,))
+	seq = cur.fetchone()["seq"]
+	result = _count_by_status(cur, user_id)
+	conn.commit()
+	cur.close()
+	conn.close()
+	return seq, result
+
+
+# MAINTENANCE
+
+def log_maintenance_run(task: str, started_at: str, duration_ms: float, ok: bool, details: Optional[str]) -> None:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute(
+		"""
+		INSERT INTO maintenance_runs (task, started_at, duration_ms, ok, details)
+		VALUES (?, ?, ?, ?, ?)
+		""",
+		(task, started_at, duration_ms, 1 if ok else 0, details),
+	)
+	conn.commit()
+	cur.close()
+	conn.close()
+
+
+def last_maintenance_run(task: str, ok_only: bool = False) -> Optional[sqlite3.Row]:
+	conn = get_connection()
+	cur = conn.cursor()
+	where = "task = ? AND ok = 1" if ok_only else "task = ?"
+	cur.execute(f"SELECT * FROM maintenance_runs WHERE {where} ORDER BY id DESC LIMIT 1", (task,))
+	row = cur.fetchone()
+	cur.close()
+	conn.close()
+	return row
+
+
+def list_maintenance_runs(limit: int = 20) -> List[sqlite3.Row]:
+	conn = get_connection()
+	cur = conn.cursor()
+	cur.execute("SELECT * FROM maintenance_runs ORDER BY id DESC LIMIT ?", (limit,))
+	rows = cur.fetchall()
+	cur.close()
+	conn.close()
+	return rows
@@ -0,0 +1,180 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import db
+
+# Rotinas de manutenção do data/app.db: backup online, verificação de integridade,
+# vacuum incremental e ANALYZE. Disparadas pelo Admin ou por run_due_tasks_async().
+
+BACKUP_KEEP = 7
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP = 0.005  # pausa entre passos para liberar o banco aos escritores
+
+SCHEDULE = [
+	("backup", timedelta(days=1)),
+	("quick_check", timedelta(days=1)),
+	("vacuum", timedelta(days=7)),
+]
+CHECK_INTERVAL = timedelta(minutes=10)
+
+_run_lock = threading.RLock()  # uma rotina por vez (agenda em segundo plano e Admin)
+_last_check: Optional[datetime] = None
+
+
+def _backup_dir() -> str:
+	return os.path.join(db.DB_DIR, "backups")
+
+
+def database_info() -> Dict[str, int]:
+	conn = db.get_connection()
+	page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+	page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+	freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+	auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+	conn.close()
+	return {
+		"size_bytes": os.path.getsize(db.DB_PATH),
+		"page_size": page_size,
+		"page_count": page_count,
+		"freelist_count": freelist_count,
+		"auto_vacuum": auto_vacuum,
+	}
+
+
+def list_backups() -> List[str]:
+	return sorted(glob.glob(os.path.join(_backup_dir(), "app-*.db")), reverse=True)
+
+
+def backup(dest_path: Optional[str] = None, pages_per_step: int = BACKUP_PAGES_PER_STEP) -> Dict:
+	# API de backup do SQLite em passos: o bloqueio de leitura só dura cada passo
+	if dest_path is None:
+		os.makedirs(_backup_dir(), exist_ok=True)
+		dest_path = os.path.join(_backup_dir(), f"app-{datetime.utcnow():%Y%m%d-%H%M%S}.db")
+
+	steps = 0
+
+	def _progress(status: int, remaining: int, total: int) -> None:
+		nonlocal steps
+		steps += 1
+		if remaining:
+			time.sleep(BACKUP_STEP_SLEEP)
+
+	# Grava em ".part" e só renomeia ao final: backups incompletos nunca entram na rotação
+	part_path = dest_path + ".part"
+	src = db.get_connection()
+	dst = sqlite3.connect(part_path)
+	try:
+		src.backup(dst, pages=pages_per_step, progress=_progress)
+		dst.close()
+		os.replace(part_path, dest_path)
+	finally:
+		dst.close()
+		src.close()
+		if os.path.exists(part_path):
+			os.remove(part_path)
+
+	removed = []
+	for old in list_backups()[BACKUP_KEEP:]:
+		os.remove(old)
+		removed.append(os.path.basename(old))
+
+	return {
+		"path": dest_path,
+		"size_bytes": os.path.getsize(dest_path),
+		"steps": steps,
+		"removed": removed,
+	}
+
+
+def integrity_check(quick: bool = False) -> Dict:
+	conn = db.get_connection()
+	pragma = "quick_check" if quick else "integrity_check"
+	messages = [r[0] for r in conn.execute(f"PRAGMA {pragma}").fetchall()]
+	conn.close()
+	return {"ok": messages == ["ok"], "messages": messages}
+
+
+def vacuum(pages: Optional[int] = None) -> Dict:
+	# Na primeira vez converte o banco para auto_vacuum=INCREMENTAL (exige um VACUUM completo)
+	before = database_info()
+	conn = db.get_connection()
+	converted = before["auto_vacuum"] != 2
+	if converted:
+		conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+		conn.execute("VACUUM")
+	elif pages:
+		conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+	else:
+		conn.execute("PRAGMA incremental_vacuum").fetchall()
+	conn.execute("ANALYZE")
+	conn.commit()
+	conn.close()
+	after = database_info()
+	return {
+		"converted": converted,
+		"size_before_bytes": before["size_bytes"],
+		"size_after_bytes": after["size_bytes"],
+		"freed_pages": before["freelist_count"] - after["freelist_count"],
+	}
+
+
+TASKS: Dict[str, Callable[[], Dict]] = {
+	"backup": backup,
+	"quick_check": lambda: integrity_check(quick=True),
+	"integrity_check": integrity_check,
+	"vacuum": vacuum,
+}
+
+
+def run_task(task: str) -> Dict:
+	# Não espera: se outra rotina estiver rodando, devolve {"ok": False, "busy": True}
+	if not _run_lock.acquire(blocking=False):
+		return {"ok": False, "busy": True}
+	try:
+		started_at = datetime.utcnow()
+		start = time.perf_counter()
+		try:
+			result = TASKS[task]()
+			ok = result.get("ok", True)
+		except Exception as e:
+			result = {"error": str(e)}
+			ok = False
+		result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+		db.log_maintenance_run(task, started_at.isoformat(), result["duration_ms"], ok, json.dumps(result, ensure_ascii=False))
+		result["ok"] = ok
+		return result
+	finally:
+		_run_lock.release()
+
+
+def run_due_tasks(now: Optional[datetime] = None) -> Dict[str, Dict]:
+	# Executa as tarefas de SCHEDULE cujo intervalo já passou desde a última execução bem-sucedida;
+	# falhas são tentadas de novo na próxima verificação (CHECK_INTERVAL)
+	if not _run_lock.acquire(blocking=False):
+		return {}
+	try:
+		now = now or datetime.utcnow()
+		results: Dict[str, Dict] = {}
+		for task, interval in SCHEDULE:
+			last = db.last_maintenance_run(task, ok_only=True)
+			if last is None or now - datetime.fromisoformat(last["started_at"]) >= interval:
+				results[task] = run_task(task)
+		return results
+	finally:
+		_run_lock.release()
+
+
+def run_due_tasks_async() -> None:
+	# Chamado a cada execução do app; verifica a agenda no máximo a cada CHECK_INTERVAL
+	global _last_check
+	now = datetime.utcnow()
+	if _last_check is not None and now - _last_check < CHECK_INTERVAL:
+		return
+	_last_check = now
+	threading.Thread(target=run_due_tasks, daemon=True).start()
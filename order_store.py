@@ -0,0 +1,247 @@
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import db
+
+# Cache opcional em memória das encomendas de cada doceria (ative com APP_ORDER_STORE=1).
+# Antes de cada leitura aplica db.changes_since (order_events), então também enxerga
+# escritas de outros processos (ex.: api.py).
+
+_FIELDS = (
+	"id",
+	"user_id",
+	"client_id",
+	"client_name",
+	"flavor",
+	"size",
+	"price",
+	"due_date",
+	"status",
+	"notes",
+	"created_at",
+	"paid_at",
+	"delivered_at",
+)
+# Valores que se repetem muito entre encomendas: uma única cópia de cada string
+_INTERNED = frozenset(("client_name", "flavor", "size", "due_date", "status"))
+
+
+def enabled() -> bool:
+	return os.environ.get("APP_ORDER_STORE", "0") == "1"
+
+
+class OrderRecord:
+	__slots__ = _FIELDS
+
+	def __init__(self, row) -> None:
+		for field in _FIELDS:
+			value = row[field]
+			if value is not None and field in _INTERNED:
+				value = sys.intern(value)
+			setattr(self, field, value)
+
+	# Mesma interface de leitura de sqlite3.Row: o["status"], dict(o)
+	def __getitem__(self, key: str):
+		return getattr(self, key)
+
+	def keys(self) -> Tuple[str, ...]:
+		return _FIELDS
+
+
+def _created_at(rec: OrderRecord) -> str:
+	return rec.created_at
+
+
+def _ordered(records: Iterable[OrderRecord]) -> List[OrderRecord]:
+	# Mesma ordenação de db.list_orders: due_date ASC, created_at DESC
+	result = sorted(records, key=_created_at, reverse=True)
+	result.sort(key=lambda r: r.due_date)
+	return result
+
+
+class _DueIndex:
+	# Encomendas agrupadas por data de entrega; cada grupo já em created_at DESC,
+	# então as leituras só concatenam os grupos, sem reordenar
+	__slots__ = ("dates", "buckets", "count")
+
+	def __init__(self) -> None:
+		self.dates: List[str] = []
+		self.buckets: Dict[str, List[OrderRecord]] = {}
+		self.count = 0
+
+	def add(self, rec: OrderRecord, sort: bool = True) -> None:
+		bucket = self.buckets.get(rec.due_date)
+		if bucket is None:
+			self.buckets[rec.due_date] = [rec]
+			if sort:
+				insort(self.dates, rec.due_date)
+			else:
+				self.dates.append(rec.due_date)
+		else:
+			bucket.append(rec)
+			if sort:
+				bucket.sort(key=_created_at, reverse=True)
+		self.count += 1
+
+	def finish(self) -> None:
+		# Usado após add(sort=False) na carga inicial
+		self.dates.sort()
+		for bucket in self.buckets.values():
+			bucket.sort(key=_created_at, reverse=True)
+
+	def discard(self, rec: OrderRecord) -> None:
+		bucket = self.buckets.get(rec.due_date)
+		if bucket is None or rec not in bucket:
+			return
+		bucket.remove(rec)
+		self.count -= 1
+		if not bucket:
+			del self.buckets[rec.due_date]
+			del self.dates[bisect_left(self.dates, rec.due_date)]
+
+	def records(self, start_iso: Optional[str] = None, end_iso: Optional[str] = None) -> List[OrderRecord]:
+		lo = 0 if start_iso is None else bisect_left(self.dates, start_iso)
+		hi = len(self.dates) if end_iso is None else bisect_right(self.dates, end_iso)
+		result: List[OrderRecord] = []
+		for due in self.dates[lo:hi]:
+			result.extend(self.buckets[due])
+		return result
+
+
+class OrderStore:
+	def __init__(self, user_id: int) -> None:
+		self.user_id = user_id
+		self.seq = 0
+		self._lock = threading.RLock()
+		self._records: Dict[int, OrderRecord] = {}
+		self._all = _DueIndex()
+		self._by_status: Dict[str, _DueIndex] = {}
+		self._by_client: Dict[int, Set[int]] = {}
+
+	def load(self) -> None:
+		with self._lock:
+			# seq lido antes da lista: eventos concorrentes são reaplicados sem efeito colateral
+			self.seq = db.latest_change_seq(self.user_id)
+			rows = db.list_orders(self.user_id)
+			self._records = {}
+			self._all = _DueIndex()
+			self._by_status = {}
+			self._by_client = {}
+			for row in rows:
+				self._index(OrderRecord(row), sort=False)
+			self._all.finish()
+			for index in self._by_status.values():
+				index.finish()
+
+	def _index(self, rec: OrderRecord, sort: bool = True) -> None:
+		self._records[rec.id] = rec
+		self._all.add(rec, sort)
+		self._by_status.setdefault(rec.status, _DueIndex()).add(rec, sort)
+		self._by_client.setdefault(rec.client_id, set()).add(rec.id)
+
+	def _unindex(self, rec: OrderRecord) -> None:
+		del self._records[rec.id]
+		self._all.discard(rec)
+		status_index = self._by_status.get(rec.status)
+		if status_index is not None:
+			status_index.discard(rec)
+		ids = self._by_client.get(rec.client_id)
+		if ids is not None:
+			ids.discard(rec.id)
+			if not ids:
+				del self._by_client[rec.client_id]
+
+	def sync(self) -> None:
+		# Aplica as alterações desde self.seq; o lock serializa as atualizações em ordem de seq
+		with self._lock:
+			changes = db.changes_since(self.user_id, self.seq)
+			for ch in changes:
+				if ch["id"] is None:
+					self.remove(ch["order_id"])
+				else:
+					self.upsert(ch)
+			if changes:
+				self.seq = changes[-1]["seq"]
+
+	def upsert(self, row) -> None:
+		rec = OrderRecord(row)
+		with self._lock:
+			old = self._records.get(rec.id)
+			if old is not None:
+				self._unindex(old)
+			self._index(rec)
+
+	def remove(self, order_id: int) -> None:
+		with self._lock:
+			rec = self._records.get(order_id)
+			if rec is not None:
+				self._unindex(rec)
+
+	def all(self) -> List[OrderRecord]:
+		with self._lock:
+			return self._all.records()
+
+	def by_status(self, statuses: Iterable[str]) -> List[OrderRecord]:
+		with self._lock:
+			indexes = [self._by_status[s] for s in statuses if s in self._by_status]
+			if len(indexes) == 1:
+				return indexes[0].records()
+			return _ordered(r for index in indexes for r in index.records())
+
+	def by_client(self, client_id: int) -> List[OrderRecord]:
+		with self._lock:
+			return _ordered(self._records[i] for i in self._by_client.get(client_id, ()))
+
+	def due_between(self, start_iso: str, end_iso: str) -> List[OrderRecord]:
+		with self._lock:
+			return self._all.records(start_iso, end_iso)
+
+	def counts(self) -> Dict[str, int]:
+		with self._lock:
+			return {s: self._by_status[s].count if s in self._by_status else 0 for s in db.STATUS_OPTIONS}
+
+	def __len__(self) -> int:
+		return len(self._records)
+
+
+_stores: Dict[int, OrderStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(user_id: int) -> OrderStore:
+	with _stores_lock:
+		store = _stores.get(user_id)
+		if store is None:
+			store = OrderStore(user_id)
+			store.load()
+			_stores[user_id] = store
+	store.sync()
+	return store
+
+
+def clear() -> None:
+	with _stores_lock:
+		_stores.clear()
+
+
+# Leituras: usam o cache quando ativo, senão consultam o banco
+
+def list_orders(user_id: int):
+	if enabled():
+		return get_store(user_id).all()
+	return db.list_orders(user_id)
+
+
+def list_orders_by_client(user_id: int, client_id: int):
+	if enabled():
+		return get_store(user_id).by_client(client_id)
+	return db.list_orders_by_client(user_id, client_id)
+
+
+def list_orders_by_status(user_id: int, statuses: List[str]):
+	if enabled():
+		return get_store(user_id).by_status(statuses)
+	return db.list_orders_by_status(user_id, statuses)
@@ -1,5 +1,6 @@
 import streamlit as st
 import db
+import order_store
 
 
 def ensure_auth():
@@ -48,7 +49,7 @@ def main():
 
 			st.markdown("---")
 			st.markdown("**Encomendas deste cliente**")
-			orders = db.list_orders_by_client(a["user_id"], c["id"]) or []
+			orders = order_store.list_orders_by_client(a["user_id"], c["id"]) or []
 			if not orders:
 				st.caption("Sem encomendas.")
 			else:
@@ -1,8 +1,9 @@
 import streamlit as st
 from datetime import date
 import db
+import order_store
 
-STATUS_OPTIONS = ["Pendente", "Pago (Em preparação)", "Entregue"]
+REFRESH_SECONDS = 10
 
 
 def ensure_auth():
@@ -11,6 +12,70 @@ def ensure_auth():
 		st.stop()
 
 
+def load_orders_feed(user_id: int):
+	# seq lido antes da lista: eventos concorrentes são reaplicados sem efeito colateral
+	seq = db.latest_change_seq(user_id)
+	orders = {o["id"]: dict(o) for o in order_store.list_orders(user_id)}
+	st.session_state.orders_feed = {"seq": seq, "orders": orders, "ordered": list(orders.values())}
+
+
+def apply_order_changes(user_id: int):
+	feed = st.session_state.orders_feed
+	changes = db.changes_since(user_id, feed["seq"])
+	if not changes:
+		return
+	orders = feed["orders"]
+	for ch in changes:
+		order_id = ch["order_id"]
+		if ch["id"] is None:
+			orders.pop(order_id, None)
+		else:
+			row = dict(ch)
+			for k in ("seq", "order_id", "kind", "old_status", "new_status"):
+				row.pop(k)
+			orders[order_id] = row
+		# Descarta o valor antigo do selectbox para refletir o novo status
+		st.session_state.pop(f"st_{order_id}", None)
+	feed["seq"] = changes[-1]["seq"]
+	# Mesma ordenação de list_orders: due_date ASC, created_at DESC
+	ordered = sorted(orders.values(), key=lambda o: o["created_at"], reverse=True)
+	ordered.sort(key=lambda o: o["due_date"])
+	feed["ordered"] = ordered
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def orders_list(user_id: int, client_id):
+	# Atualização automática: uma consulta por intervalo, aplicando só as alterações
+	apply_order_changes(user_id)
+	orders = st.session_state.orders_feed["ordered"]
+	if client_id is not None:
+		orders = [o for o in orders if o["client_id"] == client_id]
+
+	if not orders:
+		st.info("Sem encomendas registradas.")
+		return
+
+	for o in orders:
+		cols = st.columns([0.18, 0.18, 0.18, 0.18, 0.14, 0.14])
+		with cols[0]:
+			st.write(f"👤 {o['client_name']}")
+		with cols[1]:
+			st.write(f"Sabor: {o['flavor']}")
+		with cols[2]:
+			st.caption(f"Entrega: {o['due_date']}")
+		with cols[3]:
+			st.caption(f"Preço: R$ {o['price'] if o['price'] is not None else '-'}")
+		with cols[4]:
+			new_status = st.selectbox("Status", db.STATUS_OPTIONS, index=db.STATUS_OPTIONS.index(o["status"]), key=f"st_{o['id']}")
+		with cols[5]:
+			if st.button("Salvar", key=f"save_{o['id']}"):
+				if new_status != o["status"]:
+					db.update_order_status(user_id, o["id"], new_status)
+					st.success("Status atualizado.")
+					st.rerun(scope="fragment")
+		st.divider()
+
+
 def main():
 	st.set_page_config(page_title="Encomendas | Encomendas de Bolos", page_icon="🧾", layout="wide")
 	ensure_auth()
@@ -28,7 +93,7 @@ def main():
 			size = st.text_input("Tamanho (ex: 1kg, 20cm)")
 			price = st.number_input("Preço (R$)", min_value=0.0, step=0.5, format="%.2f")
 			due = st.date_input("Data de entrega", value=date.today())
-			status = st.selectbox("Status", STATUS_OPTIONS, index=0)
+			status = st.selectbox("Status", db.STATUS_OPTIONS, index=0)
 			notes = st.text_area("Observações")
 			sub = st.form_submit_button("Salvar")
 			if sub:
@@ -52,39 +117,18 @@ def main():
 
 	st.markdown("---")
 
-	orders = db.list_orders(a["user_id"]) or []
+	load_orders_feed(a["user_id"])
 
 	# Filtro por cliente
 	filter_client = st.selectbox(
 		"Filtrar por cliente",
 		["Todos"] + list(client_options.keys()) if client_options else ["Todos"],
 	)
+	client_id = None
 	if filter_client != "Todos" and client_options:
-		orders = [o for o in orders if o["client_id"] == client_options[filter_client]]
-
-	if not orders:
-		st.info("Sem encomendas registradas.")
-		return
+		client_id = client_options[filter_client]
 
-	for o in orders:
-		cols = st.columns([0.18, 0.18, 0.18, 0.18, 0.14, 0.14])
-		with cols[0]:
-			st.write(f"👤 {o['client_name']}")
-		with cols[1]:
-			st.write(f"Sabor: {o['flavor']}")
-		with cols[2]:
-			st.caption(f"Entrega: {o['due_date']}")
-		with cols[3]:
-			st.caption(f"Preço: R$ {o['price'] if o['price'] is not None else '-'}")
-		with cols[4]:
-			new_status = st.selectbox("Status", STATUS_OPTIONS, index=STATUS_OPTIONS.index(o["status"]), key=f"st_{o['id']}")
-		with cols[5]:
-			if st.button("Salvar", key=f"save_{o['id']}"):
-				if new_status != o["status"]:
-					db.update_order_status(a["user_id"], o["id"], new_status)
-					st.success("Status atualizado.")
-					st.rerun()
-		st.divider()
+	orders_list(a["user_id"], client_id)
 
 
 if __name__ == "__main__":
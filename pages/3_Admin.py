@@ -1,5 +1,8 @@
 import streamlit as st
+import json
+import api
 import db
+import maintenance
 from auth import hash_password
 
 
@@ -66,6 +69,90 @@ def main():
 		with cols[3]:
 			st.caption(u["email"] or "-")
 
+	st.markdown("---")
+
+	# Tokens da API HTTP (api.py)
+	st.markdown("### Tokens da API")
+	user_options = {u["username"]: u["id"] for u in users}
+	with st.form("add_token"):
+		token_user = st.selectbox("Usuário (doceria)", list(user_options.keys()))
+		token_name = st.text_input("Descrição (ex: Bot WhatsApp)")
+		sub = st.form_submit_button("Gerar token")
+		if sub:
+			if not token_name.strip():
+				st.error("Descrição é obrigatória.")
+			else:
+				token = api.issue_token(user_options[token_user], token_name.strip())
+				st.success("Token gerado! Copie agora, ele não será exibido novamente.")
+				st.code(token)
+
+	for t in db.list_api_tokens():
+		cols = st.columns([0.3, 0.3, 0.25, 0.15])
+		with cols[0]:
+			st.write(t["name"])
+		with cols[1]:
+			st.caption(t["username"])
+		with cols[2]:
+			st.caption(t["created_at"])
+		with cols[3]:
+			if st.button("Revogar", key=f"revoke_{t['id']}"):
+				db.delete_api_token(t["id"])
+				st.success("Token revogado.")
+				st.rerun()
+
+	st.markdown("---")
+
+	# Manutenção do banco (backup, verificação, vacuum)
+	st.markdown("### Manutenção do banco")
+	info = maintenance.database_info()
+	backups = maintenance.list_backups()
+	c1, c2, c3 = st.columns(3)
+	with c1:
+		st.metric("Tamanho do banco", f"{info['size_bytes'] / 1024:.0f} KiB")
+	with c2:
+		st.metric("Páginas livres", f"{info['freelist_count']} / {info['page_count']}")
+	with c3:
+		st.metric("Backups guardados", len(backups))
+
+	actions = [
+		("backup", "Fazer backup"),
+		("quick_check", "Verificação rápida"),
+		("integrity_check", "Verificação completa"),
+		("vacuum", "Vacuum + ANALYZE"),
+	]
+	cols = st.columns(len(actions))
+	for col, (task, label) in zip(cols, actions):
+		with col:
+			if st.button(label, key=f"maint_{task}", use_container_width=True):
+				st.session_state.maintenance_result = (label, maintenance.run_task(task))
+
+	if "maintenance_result" in st.session_state:
+		label, result = st.session_state.maintenance_result
+		if result.get("busy"):
+			st.warning(f"{label}: outra rotina de manutenção está em execução. Tente novamente em instantes.")
+		elif result["ok"]:
+			st.success(f"{label}: concluído em {result['duration_ms']} ms.")
+		else:
+			st.error(f"{label}: falhou.")
+		st.json(result)
+
+	with st.expander("Histórico de manutenção"):
+		runs = db.list_maintenance_runs()
+		if not runs:
+			st.caption("Nenhuma execução registrada.")
+		for r in runs:
+			cols = st.columns([0.2, 0.3, 0.2, 0.3])
+			with cols[0]:
+				st.write(r["task"])
+			with cols[1]:
+				st.caption(r["started_at"])
+			with cols[2]:
+				st.caption(f"{r['duration_ms']:.0f} ms")
+			with cols[3]:
+				st.caption("OK" if r["ok"] else "Falhou")
+			if not r["ok"] and r["details"]:
+				st.caption(json.loads(r["details"]).get("error", ""))
+
 
 if __name__ == "__main__":
 	main()